@@ -1,19 +1,39 @@
 class Config:
     """
     Constants for cell states in a 2D occupancy grid, simplified for visualization.
+    Each state is stored in the grid as a uint8 code; COLORS gives its display color.
     """
     __ALL_CONFIGS = {
         
         "MAX_WIDTH_PIXEL": 100,
         "MAX_HEIGHT_PIXEL": 100,
 
-        "FREE": (255, 255, 255),   # white
-        "OBSTACLE": (0, 0, 0),     # black
-        "VISITED": (0, 0, 255),    # blue
-        "START": (255, 0, 0),      # red
-        "GOAL": (0, 255, 0),       # green
+        "FREE": 255,
+        "OBSTACLE": 0,
+        "UNKNOWN": 128,
+        "VISITED": 100,
+        "START": 200,
+        "GOAL": 50,
+
+        "COLORS": {
+            "FREE": (255, 255, 255),     # white
+            "OBSTACLE": (0, 0, 0),       # black
+            "UNKNOWN": (128, 128, 128),  # gray
+            "VISITED": (0, 0, 255),      # blue
+            "START": (255, 0, 0),        # red
+            "GOAL": (0, 255, 0),         # green
+        },
     }
 
     @classmethod
     def get(cls, key):
-        return cls.__ALL_CONFIGS[key]
\ No newline at end of file
+        return cls.__ALL_CONFIGS[key]
+
+# Cell states bound once at import time, so hot loops read a module global
+# instead of calling Config.get for every cell.
+FREE = Config.get("FREE")
+OBSTACLE = Config.get("OBSTACLE")
+UNKNOWN = Config.get("UNKNOWN")
+VISITED = Config.get("VISITED")
+START = Config.get("START")
+GOAL = Config.get("GOAL")
@@ -0,0 +1,59 @@
+"""
+Numba-compiled cell queries on a raw costmap grid.
+
+These take the grid array directly so compiled planner loops can call them
+without going through Costmap methods. When Numba is not installed the same
+functions run as plain Python.
+"""
+
+from const import OBSTACLE
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit, usable with or without arguments.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def line_of_sight_nb(grid, x0, y0, x1, y1):
+    """
+    Walk the integer Bresenham line from (x0, y0) to (x1, y1), both ends
+    included, and return False as soon as a cell is an OBSTACLE.
+    """
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    x, y = x0, y0
+    while True:
+        if grid[y, x] == OBSTACLE:
+            return False
+        if x == x1 and y == y1:
+            return True
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x += sx
+        if e2 <= dx:
+            err += dx
+            y += sy
+
+
+@njit(cache=True)
+def is_obstacle_bit_nb(bits, width, x, y):
+    """
+    Return True if (x, y) is set in a packed obstacle bitmap
+    (see Costmap.obstacle_bits).
+    """
+    idx = y * width + x
+    return ((bits[idx >> 3] >> (7 - (idx & 7))) & 1) == 1
@@ -1,34 +1,270 @@
-from const import Config
+import numpy as np
+
+from const import Config, FREE, OBSTACLE, UNKNOWN, VISITED, START, GOAL
+from costmap._fast import line_of_sight_nb
+
+# Maps with more cells than this are copied in COPY_BLOCK x COPY_BLOCK tiles
+BLOCKED_COPY_MIN_CELLS = 1 << 20
+COPY_BLOCK = 64
+
+def _build_lut():
+    """
+    Build the (256, 4) lookup table mapping state codes to opaque RGBA
+    colors. Codes without a configured color are shown as their gray level.
+    """
+    lut = np.full((256, 4), 255, dtype=np.uint8)
+    lut[:, :3] = np.arange(256, dtype=np.uint8)[:, None]
+    for state, color in Config.get("COLORS").items():
+        lut[Config.get(state), :3] = color
+    return lut
+
 
 class Costmap:
     """
-    Stores occupancy grid data in a 2D list.
-    Each cell can hold a color/state such as FREE, OBSTACLE, START, etc.
+    Stores occupancy grid data in a 2D uint8 NumPy array.
+    Each cell holds a state code such as FREE, OBSTACLE, START, etc.;
+    LUT[grid] gives the RGBA image used for display.
     """
 
-    def __init__(self, rows, cols):
+    LUT = _build_lut()
+
+    def __init__(self, width=Config.get("MAX_WIDTH_PIXEL"), height=Config.get("MAX_HEIGHT_PIXEL")):
         """
-        Initialize the costmap with the specified number of rows and columns.
+        Initialize the costmap with the specified width (columns) and height (rows).
         All cells start as FREE.
         """
-        self.rows = rows
-        self.cols = cols
+        self.width = width
+        self.height = height
+        self.rows = height
+        self.cols = width
+
+        self.FREE = FREE
+        self.OBSTACLE = OBSTACLE
+        self.UNKNOWN = UNKNOWN
+        self.VISITED = VISITED
+        self.START = START
+        self.GOAL = GOAL
+
+        self.grid = np.full((height, width), self.FREE, dtype=np.uint8)
+        self.start = None
+        self.goal = None
+        assert self.grid.flags['C_CONTIGUOUS']
+
+        # Traversability mask (grid != OBSTACLE), kept in step with every mutator
+        self._free = np.ones((height, width), dtype=bool)
+
+        # Packed 1-bit-per-cell obstacle map, rebuilt lazily after edits
+        self._obstacle_bits = None
+
+        # Decoded copy of the last loaded map, reused by reset_path
+        self._base_grid = None
+        self._base_file = None
+
+    def is_within_bounds(self, x, y):
+        """
+        Return True if (x, y) lies inside the grid.
+        """
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, x, y):
+        """
+        Return True if the cell at (x, y) can be traversed, i.e. it is not an OBSTACLE.
+        """
+        return self._free[y, x]
+
+    @property
+    def obstacle_bits(self):
+        """
+        The grid as a packed bitmap: bit (y * width + x) is set for OBSTACLE
+        cells, most significant bit first. Query it from compiled code with
+        costmap._fast.is_obstacle_bit_nb. The bundled planners read the
+        uint8 grid directly; the bitmap is for callers that want the
+        compact form.
+        """
+        if self._obstacle_bits is None:
+            self._obstacle_bits = np.packbits((self.grid == self.OBSTACLE).ravel())
+        return self._obstacle_bits
+
+    def line_of_sight(self, x0, y0, x1, y1):
+        """
+        Return True if no OBSTACLE lies on the Bresenham line between
+        (x0, y0) and (x1, y1). Both end points must be inside the grid.
+        """
+        if not (self.is_within_bounds(x0, y0) and self.is_within_bounds(x1, y1)):
+            return False
+        return line_of_sight_nb(self.grid, x0, y0, x1, y1)
+
+    def set_start(self, x, y):
+        """
+        Mark (x, y) as the START cell, clearing the previous start if any.
+        """
+        if self.start is not None:
+            sx, sy = self.start
+            if self.grid[sy, sx] == self.START:
+                self.grid[sy, sx] = self.FREE
+        self.grid[y, x] = self.START
+        self._free[y, x] = True
+        self._obstacle_bits = None
+        self.start = (x, y)
+
+    def set_goal(self, x, y):
+        """
+        Mark (x, y) as the GOAL cell, clearing the previous goal if any.
+        """
+        if self.goal is not None:
+            gx, gy = self.goal
+            if self.grid[gy, gx] == self.GOAL:
+                self.grid[gy, gx] = self.FREE
+        self.grid[y, x] = self.GOAL
+        self._free[y, x] = True
+        self._obstacle_bits = None
+        self.goal = (x, y)
+
+    def toggle_obstacle(self, x, y):
+        """
+        Toggle the cell at (x, y) between UNKNOWN and OBSTACLE.
+        Cells in any other state (FREE, START, GOAL, VISITED, ...) are left as is.
+        """
+        if not self.is_within_bounds(x, y):
+            return
+        # UNKNOWN (128) and OBSTACLE (0) differ only in the UNKNOWN bit, so the
+        # toggle is val ^ UNKNOWN; val & ~UNKNOWN is zero for exactly those two.
+        val = int(self.grid[y, x])
+        if (val & ~self.UNKNOWN) == 0:
+            self.grid[y, x] = val ^ self.UNKNOWN
+            self._free[y, x] = val == self.OBSTACLE
+            if self._obstacle_bits is not None:
+                idx = y * self.width + x
+                self._obstacle_bits[idx >> 3] ^= 1 << (7 - (idx & 7))
 
-        self.FREE = Config.get("FREE")
-        self.OBSTACLE = Config.get("OBSTACLE")
-        self.VISITED = Config.get("VISITED")
-        self.START = Config.get("START")
-        self.GOAL = Config.get("GOAL")
+    def toggle_obstacles(self, xs, ys):
+        """
+        Batched toggle_obstacle: toggle every cell (xs[i], ys[i]) between
+        UNKNOWN and OBSTACLE with one fancy-indexed store.
 
-        self.grid = [
-            [self.FREE for _ in range(cols)] for _ in range(rows)
-        ]
+        Args:
+            xs (array-like): x coordinates, all inside the grid.
+            ys (array-like): y coordinates, all inside the grid.
+        """
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        vals = self.grid[ys, xs]
+        new_vals = np.where((vals & (0xFF ^ self.UNKNOWN)) == 0, vals ^ self.UNKNOWN, vals)
+        self.grid[ys, xs] = new_vals
+        self._free[ys, xs] = new_vals != self.OBSTACLE
+        self._obstacle_bits = None
 
-    def reset(self):
+    def free_cells(self):
         """
-        Reset the costmap so that all cells become FREE.
+        Return the number of FREE cells.
+        """
+        return int(np.count_nonzero(self.grid == self.FREE))
+
+    def obstacle_coords(self):
         """
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.grid[row][col] = self.FREE
+        Return the coordinates of all OBSTACLE cells.
+
+        Returns:
+            tuple: (xs, ys) integer arrays.
+        """
+        ys, xs = np.nonzero(self.grid == self.OBSTACLE)
+        return xs, ys
+
+    def obstacle_bbox(self):
+        """
+        Return the bounding box of all OBSTACLE cells.
+
+        Returns:
+            tuple or None: (x_min, y_min, x_max, y_max), or None if there are no obstacles.
+        """
+        xs, ys = self.obstacle_coords()
+        if xs.size == 0:
+            return None
+        return int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())
+
+    def load_map(self, filename):
+        """
+        Load a grayscale map image (e.g. a .pgm saved by the Costmap Builder)
+        into the grid. The image is cropped to the grid size; cells outside
+        the image stay FREE. Start and goal are cleared.
+
+        Args:
+            filename (str): Path of the image to load.
+        """
+        import imageio.v2 as imageio
+        loaded_img = np.asarray(imageio.imread(filename))
+        if loaded_img.ndim == 3:
+            loaded_img = loaded_img[..., 0]
+        # Taking one channel leaves a strided view; make it a C-ordered uint8
+        # block so the row copies below read sequentially
+        loaded_img = np.ascontiguousarray(loaded_img, dtype=np.uint8)
+
+        min_h = min(self.height, loaded_img.shape[0])
+        min_w = min(self.width, loaded_img.shape[1])
+        self.grid.fill(self.FREE)
+        if min_h * min_w > BLOCKED_COPY_MIN_CELLS:
+            # Tile the copy so source and destination of each block stay cache resident
+            for ty in range(0, min_h, COPY_BLOCK):
+                ty_end = min(ty + COPY_BLOCK, min_h)
+                for tx in range(0, min_w, COPY_BLOCK):
+                    tx_end = min(tx + COPY_BLOCK, min_w)
+                    self.grid[ty:ty_end, tx:tx_end] = loaded_img[ty:ty_end, tx:tx_end]
+        else:
+            self.grid[:min_h, :min_w] = loaded_img[:min_h, :min_w]
+        np.not_equal(self.grid, self.OBSTACLE, out=self._free)
+        self._obstacle_bits = None
+        self._base_grid = self.grid.copy()
+        self._base_file = filename
+        self.start = None
+        self.goal = None
+
+    def reset(self, value=FREE):
+        """
+        Reset the costmap so that all cells become value (FREE by default)
+        and clear start/goal. The grid is filled in place, so views held
+        elsewhere stay valid.
+
+        Args:
+            value (int, optional): State code to fill the grid with.
+        """
+        self.grid.fill(value)
+        self._free.fill(value != self.OBSTACLE)
+        self.start = None
+        self.goal = None
+        self._obstacle_bits = None
+
+    def reset_path(self, map_file=None):
+        """
+        Undo a planner run.
+
+        Without map_file, cells marked VISITED are cleared back to their
+        loaded value (FREE if no map was loaded) and START, GOAL and OBSTACLE
+        cells are left untouched. With map_file, the
+        grid is restored to that map; the decoded copy kept by load_map is
+        reused when it is the same file, so the image is not read again.
+        Start and goal are kept in both cases.
+
+        Args:
+            map_file (str, optional): Map to restore the grid from.
+        """
+        if map_file is None:
+            mask = self.grid == self.VISITED
+            if self._base_grid is None:
+                self.grid[mask] = self.FREE
+            else:
+                self.grid[mask] = self._base_grid[mask]
+            return
+
+        start, goal = self.start, self.goal
+        if map_file == self._base_file and self._base_grid is not None:
+            np.copyto(self.grid, self._base_grid)
+            np.not_equal(self.grid, self.OBSTACLE, out=self._free)
+            self._obstacle_bits = None
+        else:
+            self.load_map(map_file)
 
+        self.start = self.goal = None
+        if start is not None:
+            self.set_start(*start)
+        if goal is not None:
+            self.set_goal(*goal)
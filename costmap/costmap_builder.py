@@ -2,7 +2,12 @@
 Interactive CostmapBuilder for toggling obstacles.
 """
 
+from math import floor
+
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.transforms import Bbox
+from const import UNKNOWN
 from visualizer.visualizer import Visualizer
 
 
@@ -19,48 +24,131 @@ class CostmapBuilder(Visualizer):
         Args:
             costmap (Costmap): The costmap to modify.
         """
+        # Maps are drawn on an UNKNOWN background, as in the sample costmap.pgm
+        costmap.reset(UNKNOWN)
         super().__init__(costmap, fig_size=(10, 10))
         self.mouse_pressed = False
-        self.current_drag_cells = set()
+        # Cells already toggled during the current drag
+        self._drag_mask = np.zeros((costmap.height, costmap.width), dtype=bool)
+
+        # The grid shape is fixed for the builder's lifetime, so everything
+        # derived from it is computed once here rather than per event
+        self._W, self._H = costmap.width, costmap.height
+
+        # Redraw bookkeeping: only tiles touched since the last redraw are repainted
+        self.tile = 16
+        self.dirty = set()
+        self._all_tiles = frozenset(
+            (tx, ty)
+            for tx in range((self._W + self.tile - 1) // self.tile)
+            for ty in range((self._H + self.tile - 1) // self.tile)
+        )
+
+        # Blitting: full draws skip the animated image and grid lines and cache
+        # the rest of the axes as a background; updates restore it and redraw both.
+        # Animated artists are left out of normal draws, so on canvases that
+        # cannot blit they stay regular artists and the full redraw shows them.
+        if self.fig.canvas.supports_blit:
+            self.im.set_animated(True)
+            self.gridlines.set_animated(True)
+        self._bg = None
+
+        # While the mouse is down, dragged cells are buffered as (xs, ys) arrays
+        # and a ~60 Hz timer applies them and redraws. Queued cells and dirty
+        # tiles double as the "needs redraw" flag, so idle ticks cost nothing.
+        self._pending = []
+        self._last_cell = None
+        self._flush_timer = self.fig.canvas.new_timer(interval=16)
+        self._flush_timer.add_callback(self.flush_pending)
 
         self.cid_click = self.fig.canvas.mpl_connect('button_press_event', self.on_button_press)
         self.cid_release = self.fig.canvas.mpl_connect('button_release_event', self.on_button_release)
         self.cid_motion = self.fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
         self.cid_key = self.fig.canvas.mpl_connect('key_press_event', self.on_key)
+        self.cid_draw = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def on_button_press(self, event):
         """
-        Handle mouse press. Toggle the clicked cell if within axes.
+        Handle mouse press. Toggle the clicked cell if within axes and start
+        the redraw timer; the cell is painted on the next tick.
         """
         if event.inaxes != self.ax:
             return
         self.mouse_pressed = True
-        self.current_drag_cells.clear()
-        x, y = int(round(event.xdata)), int(round(event.ydata))
-        if self.costmap.is_within_bounds(x, y):
+        self._drag_mask.fill(False)
+        x, y = floor(event.xdata + 0.5), floor(event.ydata + 0.5)
+        if 0 <= x < self._W and 0 <= y < self._H:
             self.costmap.toggle_obstacle(x, y)
-            self.current_drag_cells.add((x, y))
-            self.update_display()
+            self._drag_mask[y, x] = True
+            self.dirty.add((x // self.tile, y // self.tile))
+        self._last_cell = (x, y)
+        self._flush_timer.start()
 
     def on_button_release(self, event):
         """
-        Handle mouse release.
+        Handle mouse release. Stop the timer and apply and draw whatever is
+        still waiting.
         """
         self.mouse_pressed = False
+        self._last_cell = None
+        self._flush_timer.stop()
+        self.flush_pending()
 
     def on_motion(self, event):
         """
-        Handle mouse drag. Toggle obstacles along the path of the drag.
+        Handle mouse drag. Queue every cell on the segment from the previous
+        mouse position to this one, so fast drags do not skip cells. The
+        queued cells are toggled together by flush_pending.
         """
         if not self.mouse_pressed:
             return
         if event.inaxes != self.ax:
+            # Leaving the axes ends the segment; re-entering starts a new one
+            self._last_cell = None
             return
-        x, y = int(round(event.xdata)), int(round(event.ydata))
-        if (x, y) not in self.current_drag_cells and self.costmap.is_within_bounds(x, y):
-            self.costmap.toggle_obstacle(x, y)
-            self.current_drag_cells.add((x, y))
-            self.update_display()
+        x, y = floor(event.xdata + 0.5), floor(event.ydata + 0.5)
+        if (x, y) == self._last_cell:
+            # Still inside the cell handled by the previous event
+            return
+        x0, y0 = self._last_cell if self._last_cell is not None else (x, y)
+        self._last_cell = (x, y)
+
+        xs, ys = self._segment_cells(x0, y0, x, y)
+        inside = (xs >= 0) & (xs < self._W) & (ys >= 0) & (ys < self._H)
+        xs, ys = xs[inside], ys[inside]
+        new = ~self._drag_mask[ys, xs]
+        if new.any():
+            xs, ys = xs[new], ys[new]
+            self._drag_mask[ys, xs] = True
+            self._pending.append((xs, ys))
+
+    def flush_pending(self):
+        """
+        Toggle all buffered drag cells in one batch and redraw once.
+        Does nothing when no cell changed since the last call.
+        """
+        if self._pending:
+            xs = np.concatenate([cells[0] for cells in self._pending])
+            ys = np.concatenate([cells[1] for cells in self._pending])
+            self._pending.clear()
+
+            self.costmap.toggle_obstacles(xs, ys)
+            self.dirty.update(zip((xs // self.tile).tolist(), (ys // self.tile).tolist()))
+        self.update_display()
+
+    @staticmethod
+    def _segment_cells(x0, y0, x1, y1):
+        """
+        Return the x and y arrays of the grid cells on the segment
+        (x0, y0) -> (x1, y1), one cell per step along the major axis.
+        """
+        n = max(abs(x1 - x0), abs(y1 - y0))
+        if n == 0:
+            return np.array([x1]), np.array([y1])
+        t = np.arange(1, n + 1) / n
+        xs = np.rint(x0 + t * (x1 - x0)).astype(np.intp)
+        ys = np.rint(y0 + t * (y1 - y0)).astype(np.intp)
+        return xs, ys
 
     def on_key(self, event):
         """
@@ -72,20 +160,72 @@ class CostmapBuilder(Visualizer):
         if event.key == '1':
             self.save_map()
         elif event.key == 'r':
-            self.costmap.reset()
+            self.costmap.reset(UNKNOWN)
+            # The grid is filled in place, so a blit of every tile is enough
+            self.dirty.update(self._all_tiles)
             self.update_display()
             print("Costmap has been reset to UNKNOWN.")
         elif event.key == '2':
             plt.close(self.fig)
 
+    def on_draw(self, event):
+        """
+        After every full draw (first show, resize, reset), cache the axes
+        background and paint the animated image on top of it.
+        """
+        canvas = self.fig.canvas
+        if not canvas.supports_blit:
+            return
+        self._bg = canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_map()
+
+    def _draw_map(self):
+        """
+        Draw the image and the cell grid lines over it.
+        """
+        self.ax.draw_artist(self.im)
+        self.ax.draw_artist(self.gridlines)
+
+    def update_display(self):
+        """
+        Repaint only the dirty tiles. The cached background is restored,
+        the image data is refreshed once and redrawn, and just the union
+        of the dirty tiles is blitted to the screen. Falls back to a full
+        redraw on backends that cannot blit or before the first draw.
+        """
+        if not self.dirty:
+            return
+        canvas = self.fig.canvas
+        if not canvas.supports_blit or self._bg is None:
+            self.dirty.clear()
+            super().update_display()
+            return
+
+        tile = self.tile
+        tiles_x = [tx for tx, _ in self.dirty]
+        tiles_y = [ty for _, ty in self.dirty]
+        x0 = min(tiles_x) * tile - 0.5
+        y0 = min(tiles_y) * tile - 0.5
+        x1 = min((max(tiles_x) + 1) * tile, self._W) - 0.5
+        y1 = min((max(tiles_y) + 1) * tile, self._H) - 0.5
+        region = Bbox([[x0, y0], [x1, y1]]).transformed(self.ax.transData)
+
+        canvas.restore_region(self._bg)
+        self.im.set_data(self.render_grid())
+        self._draw_map()
+        canvas.blit(region)
+        self.dirty.clear()
+
     def save_map(self):
         """
-        Save the costmap as costmap.pgm using imageio.
+        Save the costmap as costmap.pgm. A binary (P5) PGM is just a short
+        header followed by the raw uint8 rows, so it is written directly.
         """
-        import imageio
         print("Saving costmap as 'costmap.pgm'...")
         try:
-            imageio.imwrite("costmap.pgm", self.costmap.grid)
+            with open("costmap.pgm", "wb") as f:
+                f.write(f"P5\n{self.costmap.width} {self.costmap.height}\n255\n".encode())
+                self.costmap.grid.tofile(f)
             print("Saved successfully.")
         except Exception as e:
             print(f"Error saving map: {e}")
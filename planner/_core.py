@@ -0,0 +1,324 @@
+"""
+Compiled search kernels shared by the grid planners.
+
+Kernels work on the flattened grid (index = y * width + x) and return flat
+int32/uint8 arrays; the planners translate between (x, y) tuples and flat
+indices at the API boundary. Without Numba the kernels run as plain Python,
+so the planners only call them when HAVE_NUMBA is set and the grid has at
+least KERNEL_MIN_CELLS cells.
+"""
+
+import numpy as np
+
+from const import OBSTACLE
+from costmap._fast import njit, HAVE_NUMBA
+
+# Grids with fewer cells than this are searched in plain Python even when
+# Numba is available: below roughly 256 x 256 a Python search takes less
+# than loading (or compiling) the kernels on first use
+KERNEL_MIN_CELLS = 1 << 16
+
+
+@njit(cache=True)
+def _heap_push(heap, size, key):
+    """
+    Push key onto the int64 binary min-heap heap[:size]; return the new size.
+    """
+    i = size
+    heap[i] = key
+    while i > 0:
+        parent = (i - 1) >> 1
+        if heap[parent] <= key:
+            break
+        heap[i] = heap[parent]
+        i = parent
+    heap[i] = key
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(heap, size):
+    """
+    Pop the smallest key from heap[:size]; return (key, new size).
+    """
+    top = heap[0]
+    size -= 1
+    key = heap[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[child] >= key:
+            break
+        heap[i] = heap[child]
+        i = child
+    heap[i] = key
+    return top, size
+
+
+@njit(cache=True)
+def astar_flat(grid, width, height, start, goal):
+    """
+    A* with unit step costs and the Manhattan heuristic on a 4-connected grid.
+
+    Args:
+        grid (np.ndarray): Flattened uint8 costmap grid.
+        width (int): Grid width.
+        height (int): Grid height.
+        start (int): Flat index of the start cell.
+        goal (int): Flat index of the goal cell.
+
+    Returns:
+        tuple: (parent, expanded, found). parent[i] is the flat index of the
+        predecessor of cell i (-1 if none), expanded[i] is 1 for every cell
+        popped from the open set, found tells whether goal was reached.
+    """
+    n = width * height
+    gx = goal % width
+    gy = goal // width
+
+    g_score = np.full(n, np.iinfo(np.int32).max, dtype=np.int32)
+    parent = np.full(n, -1, dtype=np.int32)
+    expanded = np.zeros(n, dtype=np.uint8)
+    # Keys pack (f << 32) | index; a cell is pushed at most once per neighbor
+    heap = np.empty(4 * n + 1, dtype=np.int64)
+
+    g_score[start] = 0
+    h = abs(start % width - gx) + abs(start // width - gy)
+    size = _heap_push(heap, 0, (np.int64(h) << 32) | start)
+
+    while size > 0:
+        key, size = _heap_pop(heap, size)
+        current = np.int32(key & 0xFFFFFFFF)
+        if expanded[current]:
+            continue
+        expanded[current] = 1
+        if current == goal:
+            return parent, expanded, True
+
+        cx = current % width
+        cy = current // width
+        new_g = g_score[current] + 1
+        for k in range(4):
+            if k == 0:
+                if cx == 0:
+                    continue
+                nbr = current - 1
+            elif k == 1:
+                if cx == width - 1:
+                    continue
+                nbr = current + 1
+            elif k == 2:
+                if cy == 0:
+                    continue
+                nbr = current - width
+            else:
+                if cy == height - 1:
+                    continue
+                nbr = current + width
+            if grid[nbr] == OBSTACLE or new_g >= g_score[nbr]:
+                continue
+            g_score[nbr] = new_g
+            parent[nbr] = current
+            f = new_g + abs(nbr % width - gx) + abs(nbr // width - gy)
+            size = _heap_push(heap, size, (np.int64(f) << 32) | nbr)
+
+    return parent, expanded, False
+
+
+@njit(cache=True)
+def bfs_flat(grid, width, height, start, goal):
+    """
+    Breadth-first search, i.e. Dijkstra with unit step costs, on a
+    4-connected grid. Arguments and return value are as in astar_flat.
+    """
+    n = width * height
+    parent = np.full(n, -1, dtype=np.int32)
+    expanded = np.zeros(n, dtype=np.uint8)
+    seen = np.zeros(n, dtype=np.uint8)
+    # Every cell enters the queue at most once, so a plain array suffices
+    queue = np.empty(n, dtype=np.int32)
+
+    queue[0] = start
+    seen[start] = 1
+    head = 0
+    tail = 1
+
+    while head < tail:
+        current = queue[head]
+        head += 1
+        expanded[current] = 1
+        if current == goal:
+            return parent, expanded, True
+
+        cx = current % width
+        cy = current // width
+        for k in range(4):
+            if k == 0:
+                if cx == 0:
+                    continue
+                nbr = current - 1
+            elif k == 1:
+                if cx == width - 1:
+                    continue
+                nbr = current + 1
+            elif k == 2:
+                if cy == 0:
+                    continue
+                nbr = current - width
+            else:
+                if cy == height - 1:
+                    continue
+                nbr = current + width
+            if seen[nbr] or grid[nbr] == OBSTACLE:
+                continue
+            seen[nbr] = 1
+            parent[nbr] = current
+            queue[tail] = nbr
+            tail += 1
+
+    return parent, expanded, False
+
+
+@njit(cache=True)
+def reconstruct_flat(parent, goal):
+    """
+    Follow parent links from goal back to the root (parent == -1).
+
+    Returns:
+        np.ndarray: int32 indices from the root to goal. The depth is
+        counted first so the array is allocated once and filled from the back.
+    """
+    depth = 0
+    current = goal
+    while current != -1:
+        depth += 1
+        current = parent[current]
+
+    path = np.empty(depth, dtype=np.int32)
+    current = goal
+    for i in range(depth - 1, -1, -1):
+        path[i] = current
+        current = parent[current]
+    return path
+
+
+# The uncompiled reconstruct_flat, for the Python search paths: it avoids
+# compiling the kernel on first use just to walk a few hundred links
+reconstruct_flat_py = getattr(reconstruct_flat, "py_func", reconstruct_flat)
+
+
+@njit(cache=True)
+def astar_bidir_flat(grid, width, height, start, goal):
+    """
+    Bidirectional A* on a 4-connected grid with unit step costs: one search
+    runs from start towards goal, the other from goal towards start, and the
+    side with the smaller top key is expanded next.
+
+    Both sides use the averaged potential p(n) = (h_goal(n) - h_start(n)) / 2
+    of the Manhattan distances, with opposite signs, which keeps each side
+    consistent and lets them meet in the middle: keys are 2 * (g + p) in
+    integers, and the search stops once the two top keys add up to twice the
+    best start -> goal cost found through a cell reached from both sides.
+
+    Arguments are as in astar_flat.
+
+    Returns:
+        tuple: (path, expanded, found). path holds the flat indices from start
+        to goal (empty if not found), expanded[i] is 1 for every cell expanded
+        by either side.
+    """
+    n = width * height
+    inf = np.iinfo(np.int32).max
+    expanded = np.zeros(n, dtype=np.uint8)
+    if start == goal:
+        expanded[start] = 1
+        return np.array([start], dtype=np.int32), expanded, True
+
+    # Index 0 searches forward from start, index 1 backward from goal
+    g_score = np.full((2, n), inf, dtype=np.int32)
+    parent = np.full((2, n), -1, dtype=np.int32)
+    closed = np.zeros((2, n), dtype=np.uint8)
+    heaps = np.empty((2, 4 * n + 1), dtype=np.int64)
+    sizes = np.zeros(2, dtype=np.int64)
+    sx = start % width
+    sy = start // width
+    gx = goal % width
+    gy = goal // width
+    dist = abs(sx - gx) + abs(sy - gy)
+
+    g_score[0, start] = 0
+    g_score[1, goal] = 0
+    sizes[0] = _heap_push(heaps[0], 0, (np.int64(dist) << 32) | start)
+    sizes[1] = _heap_push(heaps[1], 0, (np.int64(dist) << 32) | goal)
+
+    best = inf
+    meet = -1
+    while sizes[0] > 0 and sizes[1] > 0:
+        key_fwd = heaps[0, 0] >> 32
+        key_bwd = heaps[1, 0] >> 32
+        if best != inf and key_fwd + key_bwd >= 2 * best:
+            break
+        side = 0 if key_fwd <= key_bwd else 1
+        other = 1 - side
+        sign = 1 if side == 0 else -1
+        heap = heaps[side]
+        key, size = _heap_pop(heap, sizes[side])
+        sizes[side] = size
+        current = np.int32(key & 0xFFFFFFFF)
+        if closed[side, current]:
+            continue
+        closed[side, current] = 1
+        expanded[current] = 1
+
+        cx = current % width
+        cy = current // width
+        new_g = g_score[side, current] + 1
+        for k in range(4):
+            if k == 0:
+                if cx == 0:
+                    continue
+                nbr = current - 1
+            elif k == 1:
+                if cx == width - 1:
+                    continue
+                nbr = current + 1
+            elif k == 2:
+                if cy == 0:
+                    continue
+                nbr = current - width
+            else:
+                if cy == height - 1:
+                    continue
+                nbr = current + width
+            if grid[nbr] == OBSTACLE or new_g >= g_score[side, nbr]:
+                continue
+            g_score[side, nbr] = new_g
+            parent[side, nbr] = current
+            nx = nbr % width
+            ny = nbr // width
+            h_goal = abs(nx - gx) + abs(ny - gy)
+            h_start = abs(nx - sx) + abs(ny - sy)
+            key = 2 * new_g + sign * (h_goal - h_start)
+            sizes[side] = _heap_push(heap, sizes[side], (np.int64(key) << 32) | nbr)
+            if g_score[other, nbr] != inf and new_g + g_score[other, nbr] < best:
+                best = new_g + g_score[other, nbr]
+                meet = nbr
+
+    if meet == -1:
+        return np.empty(0, dtype=np.int32), expanded, False
+
+    # start .. meet from the forward tree, then meet's successors to goal
+    head = reconstruct_flat(parent[0], meet)
+    path = np.empty(best + 1, dtype=np.int32)
+    path[:head.size] = head
+    i = head.size
+    current = parent[1, meet]
+    while current != -1:
+        path[i] = current
+        i += 1
+        current = parent[1, current]
+    return path, expanded, True
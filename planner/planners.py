@@ -2,8 +2,9 @@
 Implementation of three planners: A*, Dijkstra, and RRT.
 """
 
-import heapq
 import random
+from collections import deque
+from math import hypot
 import numpy as np
 from abc import ABC, abstractmethod
 from const import (
@@ -14,6 +15,14 @@ from const import (
     START,
     GOAL
 )
+from planner._core import (
+    HAVE_NUMBA,
+    KERNEL_MIN_CELLS,
+    astar_flat,
+    bfs_flat,
+    reconstruct_flat,
+    reconstruct_flat_py
+)
 
 
 class BasePlanner(ABC):
@@ -21,11 +30,21 @@ class BasePlanner(ABC):
     Abstract base class for planners.
     """
 
+    # 4-connected neighbor offsets (dx, dy)
+    _DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
     def __init__(self, costmap):
         """
         Initialize with a given costmap.
         """
         self.costmap = costmap
+        # Flat view of the grid, indexed by y * width + x. Costmap only ever
+        # fills its grid in place, so the view stays valid. A memoryview
+        # yields plain ints, which is cheaper per lookup than NumPy scalars.
+        self._grid1d = memoryview(costmap.grid.reshape(-1))
+        self._W = costmap.width
+        # Compiled kernels only pay off on large grids (see KERNEL_MIN_CELLS)
+        self._use_kernels = HAVE_NUMBA and costmap.width * costmap.height >= KERNEL_MIN_CELLS
 
     @abstractmethod
     def plan(self, start: tuple, goal: tuple):
@@ -41,6 +60,34 @@ class BasePlanner(ABC):
         """
         pass
 
+    def _plan_flat(self, kernel, start: tuple, goal: tuple):
+        """
+        Run a compiled search kernel from planner._core on the flattened grid,
+        mark the expanded cells VISITED and rebuild the path as (x, y) cells.
+
+        Args:
+            kernel (callable): astar_flat or bfs_flat.
+            start (tuple): (x, y) of the start cell.
+            goal (tuple): (x, y) of the goal cell.
+
+        Returns:
+            list or None: path as list of (x, y) or None if no path found.
+        """
+        grid = self.costmap.grid
+        width = self.costmap.width
+        goal_idx = goal[1] * width + goal[0]
+        parent, expanded, found = kernel(
+            grid.reshape(-1), width, self.costmap.height, start[1] * width + start[0], goal_idx
+        )
+
+        visited = expanded.reshape(grid.shape).view(bool) & (grid != START) & (grid != GOAL)
+        grid[visited] = VISITED
+
+        if not found:
+            return None
+        path = reconstruct_flat(parent, goal_idx)
+        return list(zip((path % width).tolist(), (path // width).tolist()))
+
 
 class AStarPlanner(BasePlanner):
     """
@@ -60,25 +107,22 @@ class AStarPlanner(BasePlanner):
         """
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-    def get_neighbors(self, node: tuple) -> list:
+    def get_neighbors(self, node: tuple):
         """
         Get valid 4-direction neighbors.
 
         Args:
             node (tuple): (x, y)
 
-        Returns:
-            list: list of neighbor (x, y).
+        Yields:
+            tuple: neighbor (x, y).
         """
-        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        width, height, cells = self._W, self.costmap.height, self._grid1d
         x, y = node
-        neighbors = []
-        for dx, dy in dirs:
+        for dx, dy in self._DIRS:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.costmap.width and 0 <= ny < self.costmap.height:
-                if self.costmap.grid[ny][nx] != OBSTACLE:
-                    neighbors.append((nx, ny))
-        return neighbors
+            if 0 <= nx < width and 0 <= ny < height and cells[ny * width + nx] != OBSTACLE:
+                yield nx, ny
 
     def plan(self, start: tuple, goal: tuple):
         """
@@ -91,30 +135,53 @@ class AStarPlanner(BasePlanner):
         Returns:
             list or None: path as list of (x, y) or None if no path found.
         """
-        open_set = []
+        if self._use_kernels:
+            return self._plan_flat(astar_flat, start, goal)
+
+        cells, width, height, dirs = self._grid1d, self._W, self.costmap.height, self._DIRS
+        gx, gy = goal
         came_from = {}
         gscore = {start: 0}
-        fscore = {start: self.heuristic(start, goal)}
-
-        heapq.heappush(open_set, (fscore[start], start))
-
-        while open_set:
-            _, current = heapq.heappop(open_set)
+        closed = set()
+
+        # Bucket queue: with unit steps and the Manhattan heuristic on a
+        # 4-connected grid, a neighbor's f is either the current f or f + 2,
+        # so two lists replace the heap. Entries superseded by a shorter
+        # path are skipped through the closed set.
+        f = self.heuristic(start, goal)
+        bucket, next_bucket = [start], []
+
+        while bucket or next_bucket:
+            if not bucket:
+                bucket, next_bucket = next_bucket, bucket
+                f += 2
+            current = bucket.pop()
+            if current in closed:
+                continue
+            closed.add(current)
             cx, cy = current
             if current == goal:
                 return self._reconstruct_path(came_from, current)
 
             # Mark visited if not start or goal
-            if self.costmap.grid[cy][cx] not in [START, GOAL]:
-                self.costmap.grid[cy][cx] = VISITED
-
-            for nbr in self.get_neighbors(current):
-                tentative_g = gscore[current] + 1
+            idx = cy * width + cx
+            if cells[idx] != START and cells[idx] != GOAL:
+                cells[idx] = VISITED
+
+            # get_neighbors and heuristic, inlined on local names
+            tentative_g = gscore[current] + 1
+            for dx, dy in dirs:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < width and 0 <= ny < height) or cells[ny * width + nx] == OBSTACLE:
+                    continue
+                nbr = (nx, ny)
                 if nbr not in gscore or tentative_g < gscore[nbr]:
                     came_from[nbr] = current
                     gscore[nbr] = tentative_g
-                    fscore[nbr] = tentative_g + self.heuristic(nbr, goal)
-                    heapq.heappush(open_set, (fscore[nbr], nbr))
+                    if tentative_g + abs(nx - gx) + abs(ny - gy) == f:
+                        bucket.append(nbr)
+                    else:
+                        next_bucket.append(nbr)
 
         return None
 
@@ -142,19 +209,16 @@ class DijkstraPlanner(BasePlanner):
     Dijkstra's algorithm for path planning.
     """
 
-    def get_neighbors(self, node: tuple) -> list:
+    def get_neighbors(self, node: tuple):
         """
-        4-direction neighbors excluding obstacles.
+        4-direction neighbors excluding obstacles, yielded as (x, y).
         """
-        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        width, height, cells = self._W, self.costmap.height, self._grid1d
         x, y = node
-        neighbors = []
-        for dx, dy in dirs:
+        for dx, dy in self._DIRS:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.costmap.width and 0 <= ny < self.costmap.height:
-                if self.costmap.grid[ny][nx] != OBSTACLE:
-                    neighbors.append((nx, ny))
-        return neighbors
+            if 0 <= nx < width and 0 <= ny < height and cells[ny * width + nx] != OBSTACLE:
+                yield nx, ny
 
     def plan(self, start: tuple, goal: tuple):
         """
@@ -167,35 +231,45 @@ class DijkstraPlanner(BasePlanner):
         Returns:
             list or None: path or None if not found.
         """
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from = {}
-        dist = {start: 0}
-
-        while open_set:
-            _, current = heapq.heappop(open_set)
+        if self._use_kernels:
+            # Unit step costs: Dijkstra reduces to a breadth-first search
+            return self._plan_flat(bfs_flat, start, goal)
+
+        # Unit step costs: Dijkstra reduces to a breadth-first search, and the
+        # first time a cell is reached is already along a shortest path
+        cells, width, height, dirs = self._grid1d, self._W, self.costmap.height, self._DIRS
+        queue = deque([start])
+        came_from = {start: None}
+
+        while queue:
+            current = queue.popleft()
             cx, cy = current
 
             if current == goal:
                 return self._reconstruct_path(came_from, current)
 
-            if self.costmap.grid[cy][cx] not in [START, GOAL]:
-                self.costmap.grid[cy][cx] = VISITED
-
-            for nbr in self.get_neighbors(current):
-                cost = dist[current] + 1
-                if nbr not in dist or cost < dist[nbr]:
-                    dist[nbr] = cost
+            idx = cy * width + cx
+            if cells[idx] != START and cells[idx] != GOAL:
+                cells[idx] = VISITED
+
+            # get_neighbors, inlined on local names
+            for dx, dy in dirs:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < width and 0 <= ny < height) or cells[ny * width + nx] == OBSTACLE:
+                    continue
+                nbr = (nx, ny)
+                if nbr not in came_from:
                     came_from[nbr] = current
-                    heapq.heappush(open_set, (cost, nbr))
+                    queue.append(nbr)
 
         return None
 
     def _reconstruct_path(self, came_from: dict, current: tuple) -> list:
-        path = [current]
-        while current in came_from:
-            current = came_from[current]
+        # came_from maps the start cell to None
+        path = []
+        while current is not None:
             path.append(current)
+            current = came_from[current]
         path.reverse()
         return path
 
@@ -212,6 +286,12 @@ class RRTPlanner(BasePlanner):
         self.step_size = step_size
         self.goal_bias = goal_bias
 
+        # Tree nodes as structure-of-arrays: start, up to max_iter nodes, goal
+        self._tx = np.empty(max_iter + 2, dtype=np.int32)
+        self._ty = np.empty(max_iter + 2, dtype=np.int32)
+        self._parent = np.empty(max_iter + 2, dtype=np.int32)
+        self._n = 0
+
     def plan(self, start: tuple, goal: tuple):
         """
         RRT plan from start to goal. 
@@ -221,16 +301,22 @@ class RRTPlanner(BasePlanner):
         # Ensure start and goal are marked correctly
         if self.costmap.start:
             sx, sy = self.costmap.start
-            self.costmap.grid[sy][sx] = START
+            self.costmap.grid[sy, sx] = START
         if self.costmap.goal:
             gx, gy = self.costmap.goal
-            self.costmap.grid[gy][gx] = GOAL
+            self.costmap.grid[gy, gx] = GOAL
 
         # Keep trying until a path is found or an iteration limit is reached
         max_attempts = 50  # Maximum number of attempts to find a path
+        step_sq = self.step_size * self.step_size
+        cells, width, height = self._grid1d, self._W, self.costmap.height
+        in_tree = np.zeros((height, width), dtype=bool)
         for attempt in range(max_attempts):
-            tree = {start: None}
-            
+            in_tree.fill(False)
+            self._n = 0
+            self._add_node(start, -1)
+            in_tree[start[1], start[0]] = True
+
             for _ in range(self.max_iter):
                 # Introduce goal bias
                 if random.random() < self.goal_bias:
@@ -238,30 +324,39 @@ class RRTPlanner(BasePlanner):
                 else:
                     rand_node = self._sample_node()
 
-                nearest_node = self._nearest(rand_node, tree.keys())
+                nearest = self._nearest(rand_node)
+                nearest_node = (int(self._tx[nearest]), int(self._ty[nearest]))
                 new_node = self._steer(nearest_node, rand_node, self.step_size)
 
-                if self._is_free(new_node):
-                    tree[new_node] = nearest_node
-                    x, y = new_node
-                    if self.costmap.grid[y][x] not in [START, GOAL]:
-                        self.costmap.grid[y][x] = VISITED
-                    
-                    if self._distance(new_node, goal) <= self.step_size:
-                        tree[goal] = new_node
-                        path = self._reconstruct_path(tree, goal)
+                # Bounds and obstacle test on local names
+                x, y = new_node
+                if not (0 <= x < width and 0 <= y < height):
+                    continue
+                idx = y * width + x
+                val = cells[idx]
+                if val != OBSTACLE and not in_tree[y, x]:
+                    new = self._add_node(new_node, nearest)
+                    in_tree[y, x] = True
+                    if val != START and val != GOAL:
+                        cells[idx] = VISITED
+
+                    dx, dy = goal[0] - x, goal[1] - y
+                    if dx * dx + dy * dy <= step_sq:
+                        # _steer returns the goal itself when it is within
+                        # reach; it is then already the newest tree node
+                        if (x, y) != goal:
+                            new = self._add_node(goal, new)
+                        path = self._reconstruct_path(new)
                         # Mark path on the costmap (Optional visualization)
                         for x, y in path:
-                            if self.costmap.grid[y][x] not in [START, GOAL]:
-                                self.costmap.grid[y][x] = FREE  # Or a special PATH value if you want to distinguish it
+                            if self.costmap.grid[y, x] not in [START, GOAL]:
+                                self.costmap.grid[y, x] = FREE  # Or a special PATH value if you want to distinguish it
                         return path
 
             # If path not found in this attempt, reset VISITED cells and try again with a new seed
             print(f"Attempt {attempt + 1}: Path not found, retrying...")
-            for y in range(self.costmap.height):
-                for x in range(self.costmap.width):
-                    if self.costmap.grid[y][x] == VISITED:
-                        self.costmap.grid[y][x] = UNKNOWN  # Reset visited cells
+            grid = self.costmap.grid
+            grid[grid == VISITED] = UNKNOWN  # Reset visited cells
 
         print("Failed to find a path after multiple attempts.")
         return None
@@ -274,11 +369,24 @@ class RRTPlanner(BasePlanner):
         y = random.randint(0, self.costmap.height - 1)
         return x, y
 
-    def _nearest(self, rand_node: tuple, nodes: list) -> tuple:
+    def _add_node(self, node: tuple, parent: int) -> int:
+        """
+        Append node to the tree arrays with the given parent index; return its index.
+        """
+        i = self._n
+        self._tx[i], self._ty[i] = node
+        self._parent[i] = parent
+        self._n = i + 1
+        return i
+
+    def _nearest(self, rand_node: tuple) -> int:
         """
-        Find the nearest node in 'nodes' to 'rand_node'.
+        Return the index of the tree node nearest to 'rand_node'.
+        Squared distance has the same argmin as Euclidean, so no sqrt is taken.
         """
-        return min(nodes, key=lambda n: self._distance(n, rand_node))
+        dx = self._tx[:self._n] - rand_node[0]
+        dy = self._ty[:self._n] - rand_node[1]
+        return int(np.argmin(dx * dx + dy * dy))
 
     def _steer(self, from_node: tuple, to_node: tuple, step_size: int) -> tuple:
         """
@@ -300,27 +408,15 @@ class RRTPlanner(BasePlanner):
         step_y = int(round(y1 + dy))
         return step_x, step_y
     
-    def _is_free(self, node: tuple) -> bool:
-        """
-        Check if the cell is not an obstacle and is within bounds.
-        """
-        x, y = node
-        return self.costmap.is_within_bounds(x, y) and self.costmap.is_free(x, y)
-        
-
     def _distance(self, a: tuple, b: tuple) -> float:
         """
         Euclidean distance between two nodes.
         """
-        return np.hypot(a[0] - b[0], a[1] - b[1])
+        return hypot(a[0] - b[0], a[1] - b[1])
 
-    def _reconstruct_path(self, tree: dict, current: tuple) -> list:
+    def _reconstruct_path(self, current: int) -> list:
         """
-        Reconstruct the path from the tree dict.
+        Reconstruct the path ending at tree node index 'current' by following parent indices.
         """
-        path = [current]
-        while tree[current] is not None:
-            current = tree[current]
-            path.append(current)
-        path.reverse()
-        return path
+        nodes = reconstruct_flat_py(self._parent, current)
+        return list(zip(self._tx[nodes].tolist(), self._ty[nodes].tolist()))
@@ -3,6 +3,14 @@ import matplotlib.pyplot as plt
 from heapq import heappush, heappop
 from costmap.costmap import Costmap
 from const import *
+from planner._core import (
+    HAVE_NUMBA,
+    KERNEL_MIN_CELLS,
+    astar_bidir_flat,
+    astar_flat,
+    reconstruct_flat,
+    reconstruct_flat_py
+)
 
 
 class Planner:
@@ -21,6 +29,15 @@ class Planner:
             costmap (Costmap): The Costmap instance to be used for planning.
         """
         self.costmap = costmap
+        # Flat view of the grid, indexed by y * width + x (see BasePlanner)
+        self._grid1d = memoryview(costmap.grid.reshape(-1))
+        self._W, self._H = costmap.width, costmap.height
+        # Compiled kernels only pay off on large grids (see KERNEL_MIN_CELLS)
+        self._use_kernels = HAVE_NUMBA and self._W * self._H >= KERNEL_MIN_CELLS
+        # 4-connected moves as (dx, dy, flat index offset) in the grid padded
+        # by one cell on every side, whose rows are W + 2 cells long
+        stride = self._W + 2
+        self._dirs = ((-1, 0, -1), (1, 0, 1), (0, -1, -stride), (0, 1, stride))
 
     def heuristic(self, a: tuple, b: tuple):
         """
@@ -45,12 +62,19 @@ class Planner:
         Returns:
             list: A list of neighboring nodes that are within bounds and free.
         """
+        x, y = node
+        width, height, cells = self._W, self._H, self._grid1d
+        idx = y * width + x
         neighbors = []
-        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # 4-connected grid
-        for dx, dy in dirs:
-            x2, y2 = node[0] + dx, node[1] + dy
-            if self.costmap.is_within_bounds(x2, y2) and self.costmap.is_free(x2, y2):
-                neighbors.append((x2, y2))
+        # Left, right, down, up: offsets -1, +1, -W, +W in the flat grid
+        if x > 0 and cells[idx - 1] != OBSTACLE:
+            neighbors.append((x - 1, y))
+        if x < width - 1 and cells[idx + 1] != OBSTACLE:
+            neighbors.append((x + 1, y))
+        if y > 0 and cells[idx - width] != OBSTACLE:
+            neighbors.append((x, y - 1))
+        if y < height - 1 and cells[idx + width] != OBSTACLE:
+            neighbors.append((x, y + 1))
         return neighbors
 
     def a_star(self, start: tuple, goal: tuple):
@@ -64,37 +88,146 @@ class Planner:
         Returns:
             list or None: A list of nodes representing the path from start to goal, or None if no path is found.
         """
+        if self._use_kernels:
+            return self.a_star_flat(start, goal)
+
+        # Traversability cannot change during a search, so it is taken once
+        # as a flat bool mask and each neighbor test is a single lookup. The
+        # mask is padded with a one-cell non-walkable border, so neighbors off
+        # the map fail that lookup and no bounds checks are needed. All flat
+        # indices below are into the padded grid: (y + 1) * stride + (x + 1).
+        width, height = self._W, self._H
+        stride = width + 2
+        n = stride * (height + 2)
+        walkable = memoryview(np.pad(self.costmap.grid != OBSTACLE, 1).reshape(-1))
+
+        # Closed flags and g-scores are flat per-cell arrays instead of a set
+        # and a dict keyed by tuples: one index, no hashing
+        closed = bytearray(n)
+        g_score = memoryview(np.full(n, np.iinfo(np.int32).max, dtype=np.int32))
+        start_idx = (start[1] + 1) * stride + start[0] + 1
+        g_score[start_idx] = 0
+
+        # Everything the loop touches is bound to a local name once
+        dirs, gx, gy = self._dirs, goal[0] + 1, goal[1] + 1
+        push, pop = heappush, heappop
+        goal_idx = gy * stride + gx
+
+        # Heap entries are plain ints (f << shift) | flat index, so heapq
+        # compares single integers rather than (f, (x, y)) tuples
+        shift = n.bit_length()
+        mask = (1 << shift) - 1
+
         open_set = []
-        heappush(open_set, (0, start))
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: self.heuristic(start, goal)}
-        closed_set = set()
+        push(open_set, start_idx)
 
-        while open_set:
-            current = heappop(open_set)[1]
-
-            if current == goal:
-                return self.reconstruct_path(came_from, current)
-
-            closed_set.add(current)
-            self.costmap.grid[current[1]][current[0]
-                                          ] = VISITED  # Mark as visited
-
-            for neighbor in self.get_neighbors(current):
-                if neighbor in closed_set:
-                    continue
-                # Assume cost=1 for movement
-                tentative_g_score = g_score[current] + 1
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + \
-                        self.heuristic(neighbor, goal)
-                    heappush(open_set, (f_score[neighbor], neighbor))
+        # Predecessors as flat indices (-1 for none) rather than a dict of
+        # (x, y) tuples; nodes are only turned into tuples for the final path
+        parent = np.full(n, -1, dtype=np.int32)
+        came_from = memoryview(parent)
 
+        while open_set:
+            idx = pop(open_set) & mask
+            if closed[idx]:
+                # Stale entry left behind by a later, cheaper push
+                continue
+            if idx == goal_idx:
+                self._mark_expanded(self._unpad(closed), goal[1] * width + goal[0])
+                ys, xs = np.divmod(reconstruct_flat_py(parent, goal_idx), stride)
+                return list(zip((xs - 1).tolist(), (ys - 1).tolist()))
+            cy, cx = divmod(idx, stride)
+
+            # The grid is left alone during the search; the closed flags are
+            # written out as VISITED in one pass when it ends
+            closed[idx] = 1
+
+            # get_neighbors and heuristic, inlined
+            tentative_g_score = g_score[idx] + 1  # Assume cost=1 for movement
+            for dx, dy, d_idx in dirs:
+                n_idx = idx + d_idx
+                # The Manhattan heuristic is consistent for unit steps, so a
+                # closed cell already holds its optimal g and fails this test;
+                # no separate closed check or reopening is needed
+                if walkable[n_idx] and tentative_g_score < g_score[n_idx]:
+                    came_from[n_idx] = idx
+                    g_score[n_idx] = tentative_g_score
+                    f = tentative_g_score + abs(cx + dx - gx) + abs(cy + dy - gy)
+                    push(open_set, (f << shift) | n_idx)
+
+        self._mark_expanded(self._unpad(closed), goal[1] * width + goal[0])
         return None  # No path found
 
+    def a_star_flat(self, start: tuple, goal: tuple):
+        """
+        Runs A* through the compiled astar_flat kernel on the flattened grid.
+        Same result and VISITED marking as the Python search in a_star.
+
+        Args:
+            start (tuple): The starting node as (x, y).
+            goal (tuple): The goal node as (x, y).
+
+        Returns:
+            list or None: A list of nodes representing the path from start to goal, or None if no path is found.
+        """
+        grid = self.costmap.grid
+        width = self.costmap.width
+        goal_idx = goal[1] * width + goal[0]
+        parent, expanded, found = astar_flat(
+            grid.reshape(-1), width, self.costmap.height, start[1] * width + start[0], goal_idx)
+
+        self._mark_expanded(expanded, goal_idx)
+        if not found:
+            return None
+        return self._decode_path(reconstruct_flat(parent, goal_idx))
+
+    def a_star_bidir(self, start: tuple, goal: tuple):
+        """
+        Runs bidirectional A* through the compiled astar_bidir_flat kernel:
+        the search grows from start and from goal and stops once the two
+        frontiers meet. a_star does not route here, since on the maps
+        measured it was no faster than a_star_flat; call it explicitly.
+
+        Args:
+            start (tuple): The starting node as (x, y).
+            goal (tuple): The goal node as (x, y).
+
+        Returns:
+            list or None: A list of nodes representing the path from start to goal, or None if no path is found.
+        """
+        width = self.costmap.width
+        goal_idx = goal[1] * width + goal[0]
+        path, expanded, found = astar_bidir_flat(
+            self.costmap.grid.reshape(-1), width, self.costmap.height, start[1] * width + start[0], goal_idx)
+
+        self._mark_expanded(expanded, goal_idx)
+        if not found:
+            return None
+        return self._decode_path(path)
+
+    def _mark_expanded(self, expanded, goal_idx: int):
+        """
+        Marks the cells a kernel expanded as VISITED. Every expanded node
+        except the goal is marked, as in a_star.
+        """
+        grid = self.costmap.grid
+        expanded[goal_idx] = 0
+        grid[expanded.reshape(grid.shape).view(bool)] = VISITED
+
+    def _unpad(self, closed):
+        """
+        Crops a flat per-cell buffer of the padded grid used by a_star back
+        to a flat uint8 array of the costmap's size.
+        """
+        padded = np.frombuffer(closed, dtype=np.uint8).reshape(self._H + 2, self._W + 2)
+        return padded[1:-1, 1:-1].ravel()
+
+    def _decode_path(self, path):
+        """
+        Converts an array of flat indices into a list of (x, y) nodes.
+        """
+        width = self.costmap.width
+        return list(zip((path % width).tolist(), (path // width).tolist()))
+
     def reconstruct_path(self, came_from: dict, current: tuple):
         """
         Reconstructs the path from the goal to the start using the came_from map.
@@ -126,7 +259,7 @@ class PathVisualizer:
         cmap (Colormap): The color map used for displaying the Costmap.
         im (AxesImage): The image object representing the Costmap on the axes.
         mode (str): Current mode of the visualizer ('start' or 'goal').
-        path (list or None): The planned path as a list of nodes, or None if no path is found.
+        path (np.ndarray or None): The planned path as an (N, 2) int32 array of (x, y) nodes, or None if no path is found.
     """
 
     def __init__(self, costmap: Costmap, planner: Planner):
@@ -147,6 +280,14 @@ class PathVisualizer:
         self.ax.set_yticks(np.arange(-0.5, self.costmap.height, 1), minor=True)
         self.ax.grid(which='minor', color='lightgrey',
                      linestyle='-', linewidth=0.5)
+        # Path and start/goal markers are created once and only get new data
+        self._path_line, = self.ax.plot([], [], color='green', linewidth=2,
+                                        label='Path', zorder=2, visible=False)
+        self._start_marker = self.ax.scatter([], [], c='blue', marker='o', s=100,
+                                             label='Start', zorder=3, visible=False)
+        self._goal_marker = self.ax.scatter([], [], c='red', marker='x', s=100,
+                                            label='Goal', zorder=3, visible=False)
+        self._legend_labels = None
         self.mode = 'start'
         self.path = None
         self.cid_click = self.fig.canvas.mpl_connect(
@@ -205,7 +346,8 @@ class PathVisualizer:
         if path:
             print("Path found:")
             print(path)
-            self.path = path
+            # Kept as an (N, 2) array of (x, y) rows so plotting can slice columns
+            self.path = np.asarray(path, dtype=np.int32)
         else:
             print("No path found.")
             self.path = None
@@ -224,43 +366,29 @@ class PathVisualizer:
         """
         Updates the visualization to reflect the current state of the Costmap and the planned path.
         """
-        # Update the grid data
-        display_grid = np.copy(self.costmap.grid)
-        self.im.set_data(display_grid)
-        self.im.set_clim(vmin=0, vmax=255)
-
-        # Remove existing path lines
-        lines = [line for line in self.ax.lines if line.get_label() == 'Path']
-        for line in lines:
-            line.remove()
+        # Update the grid data; vmin/vmax were fixed by imshow in __init__
+        self.im.set_data(self.costmap.grid)
 
         # Plot the path if it exists
-        if self.path:
-            # Extract x and y coordinates
-            x_coords = [x for (x, y) in self.path]
-            y_coords = [y for (x, y) in self.path]
-            self.ax.plot(x_coords, y_coords, color='green',
-                         linewidth=2, label='Path', zorder=2)
-
-        # Remove existing scatter plots for start and goal
-        scatters = [scatter for scatter in self.ax.collections if scatter.get_label() in [
-            'Start', 'Goal']]
-        for scatter in scatters:
-            scatter.remove()
+        if self.path is not None:
+            self._path_line.set_data(self.path[:, 0], self.path[:, 1])
+        self._path_line.set_visible(self.path is not None)
 
         # Plot start and goal on top
         if self.costmap.start:
-            self.ax.scatter(self.costmap.start[0], self.costmap.start[1],
-                            c='blue', marker='o', s=100, label='Start', zorder=3)
+            self._start_marker.set_offsets([self.costmap.start])
+        self._start_marker.set_visible(bool(self.costmap.start))
         if self.costmap.goal:
-            self.ax.scatter(self.costmap.goal[0], self.costmap.goal[1],
-                            c='red', marker='x', s=100, label='Goal', zorder=3)
-
-        # Update the legend
-        handles, labels = self.ax.get_legend_handles_labels()
-        by_label = dict(zip(labels, handles))
-        self.ax.legend(by_label.values(), by_label.keys(),
-                       bbox_to_anchor=(1.05, 1), loc='upper left')
+            self._goal_marker.set_offsets([self.costmap.goal])
+        self._goal_marker.set_visible(bool(self.costmap.goal))
+
+        # Update the legend with the artists currently shown, only when that
+        # set changes since the legend layout is costly
+        handles = [a for a in (self._path_line, self._start_marker, self._goal_marker) if a.get_visible()]
+        labels = tuple(a.get_label() for a in handles)
+        if labels != self._legend_labels:
+            self.ax.legend(handles, labels, bbox_to_anchor=(1.05, 1), loc='upper left')
+            self._legend_labels = labels
 
         self.fig.canvas.draw_idle()
 
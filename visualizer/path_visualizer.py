@@ -41,6 +41,25 @@ class PathVisualizer(Visualizer):
         self.ax_menu = self.fig.add_subplot(gridspec[0, 1])
         self.ax_menu.set_axis_off()
 
+        # Blitting: the grid image, grid lines, path, markers, legend and menu
+        # status are animated, so a full draw caches the rest of the figure (axes
+        # and ticks) as a background and updates only repaint those over it.
+        # Normal draws skip animated artists, so without blit support they
+        # stay regular artists and every update is a full draw.
+        self._blit = self.fig.canvas.supports_blit
+        self.im.set_animated(self._blit)
+        self.gridlines.set_animated(self._blit)
+        self._bg = None
+
+        # Path and start/goal markers are created once and only get new data
+        self._path_line, = self.ax_map.plot([], [], color='green', linewidth=2, label='Path',
+                                            animated=self._blit, visible=False)
+        self._start_marker = self.ax_map.scatter([], [], c='blue', marker='o', s=100, label='Start',
+                                                 zorder=3, animated=self._blit, visible=False)
+        self._goal_marker = self.ax_map.scatter([], [], c='red', marker='x', s=100, label='Goal',
+                                                zorder=3, animated=self._blit, visible=False)
+        self._legend_labels = None
+
         # Default planner is A*
         self.planner = AStarPlanner(self.costmap)
         self.current_planner_name = 'A*'
@@ -52,7 +71,9 @@ class PathVisualizer(Visualizer):
         # Connect Matplotlib events
         self.cid_click = self.fig.canvas.mpl_connect('button_press_event', self.onclick)
         self.cid_key = self.fig.canvas.mpl_connect('key_press_event', self.onkey)
+        self.cid_draw = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
+        self._build_menu()
         self.update_menu()
 
     def onclick(self, event):
@@ -95,18 +116,24 @@ class PathVisualizer(Visualizer):
         elif event.key == '2':
             self.mode = 'goal'
             print("Mode: Set Goal")
-        elif event.key == '3':
-            self.run_planner()
         elif event.key == 'p':
             self.switch_planner('A*')
         elif event.key == 'd':
             self.switch_planner('Dijkstra')
         elif event.key == 'r':
             self.switch_planner('RRT')
+        elif event.key == '3':
+            # run_planner and reset_map redraw through update_display
+            self.run_planner()
+            return
         elif event.key == 'c':
             self.reset_map()
+            return
         elif event.key == 'q':
             plt.close(self.fig)
+            return
+        else:
+            return
 
         self.update_menu()
 
@@ -143,12 +170,14 @@ class PathVisualizer(Visualizer):
         path = self.planner.plan(self.costmap.start, self.costmap.goal)
         if path:
             print("Path found:", path)
-            self.path = path
+            # Kept as an (N, 2) array of (x, y) rows so plotting can slice columns
+            self.path = np.asarray(path, dtype=np.int32)
 
             # ---- Update the costmap so that path cells become FREE ----
-            for (px, py) in self.path:
-                if self.costmap.grid[py][px] not in [START, GOAL]:
-                    self.costmap.grid[py][px] = FREE
+            flat = self.costmap.grid.reshape(-1)
+            idx = self.path[:, 1] * self.costmap.width + self.path[:, 0]
+            vals = flat[idx]
+            flat[idx[(vals != START) & (vals != GOAL)]] = FREE
         else:
             print("No path found.")
             self.path = None
@@ -175,81 +204,42 @@ class PathVisualizer(Visualizer):
         Refresh the map display. Plots the costmap grid, the path (if any),
         and the start/goal markers.
         """
-        super().update_display()
-
-        # Remove old path lines
-        old_lines = [line for line in self.ax_map.lines if line.get_label() == 'Path']
-        for line in old_lines:
-            line.remove()
+        self.im.set_data(self.render_grid())
 
         # Plot the path (green line)
-        if self.path:
-            xs = [p[0] for p in self.path]
-            ys = [p[1] for p in self.path]
-            self.ax_map.plot(xs, ys, color='green', linewidth=2, label='Path')
+        if self.path is not None:
+            self._path_line.set_data(self.path[:, 0], self.path[:, 1])
+        self._path_line.set_visible(self.path is not None)
 
-        # Plot start as a blue circle
+        # Plot start as a blue circle and goal as a red 'x'
         if self.costmap.start:
-
-            # Remove specific scatter elements by label
-            old_scatters = [
-                scatter for scatter in self.ax_map.collections
-                if scatter.get_label() in ['Start']
-            ]
-
-            for scatter in old_scatters:
-                scatter.remove()
-
-            sx, sy = self.costmap.start
-            self.ax_map.scatter(sx, sy, c='blue', marker='o', s=100, label='Start', zorder=3)
-
-        # Plot goal as a red 'x'
+            self._start_marker.set_offsets([self.costmap.start])
+        self._start_marker.set_visible(bool(self.costmap.start))
         if self.costmap.goal:
+            self._goal_marker.set_offsets([self.costmap.goal])
+        self._goal_marker.set_visible(bool(self.costmap.goal))
 
-            # Remove specific scatter elements by label
-            old_scatters = [
-                scatter for scatter in self.ax_map.collections
-                if scatter.get_label() in ['Goal']
-            ]
-
-            for scatter in old_scatters:
-                scatter.remove()
-
-            gx, gy = self.costmap.goal
-            self.ax_map.scatter(gx, gy, c='red', marker='x', s=100, label='Goal', zorder=3)
+        # Update legend with the artists currently shown; laying it out is
+        # costly, so it is only rebuilt when that set changes
+        handles = [a for a in (self._path_line, self._start_marker, self._goal_marker) if a.get_visible()]
+        labels = tuple(a.get_label() for a in handles)
+        if labels != self._legend_labels:
+            self.ax_map.legend(handles, labels, loc='upper right').set_animated(self._blit)
+            self._legend_labels = labels
 
-        # Update legend
-        handles, labels = self.ax_map.get_legend_handles_labels()
-        by_label = dict(zip(labels, handles))
-        self.ax_map.legend(by_label.values(), by_label.keys(), loc='upper right')
-
-        self.fig.canvas.draw_idle()
         self.update_menu()
 
-    def update_menu(self):
+    def _build_menu(self):
         """
-        Redraw the right-hand menu with current information:
-        planner name, mode, start, goal, etc.
+        Lay out the right-hand menu once: the title and the key list are
+        static, and the status block is a single text updated by update_menu.
         """
-        self.ax_menu.clear()
-        self.ax_menu.set_axis_off()
-
         self.ax_menu.text(0.05, 0.95, "Path Planning Menu", fontsize=14, va='top', fontweight='bold')
-        lines = [
-            f"Planner: {self.current_planner_name}",
-            f"Mode: {self.mode}",
-            f"Start: {self.costmap.start}",
-            f"Goal: {self.costmap.goal}",
-            f"Path length: {len(self.path) if self.path else None}"
-        ]
-        y_pos = 0.85
-        for line in lines:
-            self.ax_menu.text(0.05, y_pos, line, fontsize=12, va='top')
-            y_pos -= 0.07
-
-        self.ax_menu.text(0.05, y_pos, "[Keys]", fontsize=12, va='top', fontweight='bold')
-        y_pos -= 0.07
-
+        # One multi-line text per block; the line spacing matches the
+        # former per-line layout (0.07 and 0.06 of the axes height)
+        self._menu_status = self.ax_menu.text(0.05, 0.85, "", fontsize=12, va='top',
+                                              linespacing=1.9, animated=self._blit)
+        self.ax_menu.text(0.05, 0.50, "[Keys]", fontsize=12, va='top', fontweight='bold')
         cmds = [
             "1: Set Start",
             "2: Set Goal",
@@ -260,11 +250,60 @@ class PathVisualizer(Visualizer):
             "c: Reset map",
             "q: Exit"
         ]
-        for cmd in cmds:
-            self.ax_menu.text(0.05, y_pos, cmd, fontsize=10, va='top')
-            y_pos -= 0.06
+        self.ax_menu.text(0.05, 0.43, "\n".join(cmds), fontsize=10, va='top', linespacing=2.0)
+
+    def update_menu(self):
+        """
+        Redraw the right-hand menu with current information:
+        planner name, mode, start, goal, etc.
+        """
+        lines = [
+            f"Planner: {self.current_planner_name}",
+            f"Mode: {self.mode}",
+            f"Start: {self.costmap.start}",
+            f"Goal: {self.costmap.goal}",
+            f"Path length: {len(self.path) if self.path is not None else None}"
+        ]
+        self._menu_status.set_text("\n".join(lines))
+        self.redraw()
 
-        self.fig.canvas.draw_idle()
+    def on_draw(self, event):
+        """
+        After every full draw, cache the figure background and paint the
+        animated artists on top of it.
+        """
+        if not self._blit:
+            return
+        canvas = self.fig.canvas
+        self._bg = canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        """
+        Draw the animated artists: the map image, then the grid lines, path
+        and markers in z-order, the legend, and the menu status text.
+        """
+        self.ax_map.draw_artist(self.im)
+        for artist in sorted(self.ax_map.collections + self.ax_map.lines, key=lambda a: a.get_zorder()):
+            self.ax_map.draw_artist(artist)
+        legend = self.ax_map.get_legend()
+        if legend is not None:
+            self.ax_map.draw_artist(legend)
+        self.ax_menu.draw_artist(self._menu_status)
+
+    def redraw(self):
+        """
+        Put the current state on screen. Restores the cached background and
+        blits the animated artists over it; falls back to a full draw on
+        backends that cannot blit or before the first draw.
+        """
+        canvas = self.fig.canvas
+        if not self._blit or self._bg is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._bg)
+        self._draw_animated()
+        canvas.blit(self.fig.bbox)
 
     def show(self):
         """
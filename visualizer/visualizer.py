@@ -1,18 +1,59 @@
-import random
-import pygame
+"""
+Base Matplotlib visualizer shared by the Costmap Builder and Path Visualizer.
+"""
 
-from abc import ABC, abstractmethod
-from const import Config
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
 
 
-class Visualizer(ABC):
+class Visualizer:
     """
-    Abstract base class for all visualizers.
+    Base class for all visualizers. Shows the costmap grid as an image
+    on a Matplotlib axes; subclasses add their own event handlers.
     """
 
-    @abstractmethod
-    def draw(self, screen):
+    def __init__(self, costmap, fig_size=(10, 10)):
         """
-        Draw method to be implemented by subclasses.
+        Create the figure and draw the initial costmap.
+
+        Args:
+            costmap (Costmap): The costmap to display.
+            fig_size (tuple): Matplotlib figure size in inches.
+        """
+        self.costmap = costmap
+        self.fig, self.ax = plt.subplots(figsize=fig_size)
+        # uint8 RGBA needs no normalization or colormapping in Agg; the
+        # buffer is reused for every refresh instead of allocating LUT[grid]
+        self._rgba = np.empty((costmap.height, costmap.width, 4), dtype=np.uint8)
+        self.im = self.ax.imshow(self.render_grid(), origin='lower', interpolation='nearest')
+        self.gridlines = self.ax.add_collection(self._cell_lines(), autolim=False)
+
+    def _cell_lines(self):
+        """
+        Build the cell borders as one LineCollection, so the grid is a single
+        artist instead of a minor tick gridline per row and column.
+        """
+        width, height = self.costmap.width, self.costmap.height
+        xs = np.arange(width + 1) - 0.5
+        ys = np.arange(height + 1) - 0.5
+        vertical = np.stack([np.column_stack([xs, np.full_like(xs, -0.5)]),
+                             np.column_stack([xs, np.full_like(xs, height - 0.5)])], axis=1)
+        horizontal = np.stack([np.column_stack([np.full_like(ys, -0.5), ys]),
+                               np.column_stack([np.full_like(ys, width - 0.5), ys])], axis=1)
+        return LineCollection(np.concatenate([vertical, horizontal]),
+                              colors='lightgrey', linewidths=0.5)
+
+    def render_grid(self):
+        """
+        Color the costmap grid into the preallocated RGBA buffer and return it.
+        """
+        np.take(self.costmap.LUT, self.costmap.grid, axis=0, out=self._rgba)
+        return self._rgba
+
+    def update_display(self):
+        """
+        Push the current costmap grid to the image and request a redraw.
         """
-        pass
+        self.im.set_data(self.render_grid())
+        self.fig.canvas.draw_idle()